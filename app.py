@@ -1,21 +1,39 @@
 import os
 import io
 import json
-import ast
+import re
 import operator
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import orjson
+import ormsgpack
 from dotenv import load_dotenv
 from fastapi import FastAPI, UploadFile, File, Request
 from fastapi.responses import (
     HTMLResponse,
-    StreamingResponse,
     JSONResponse,
+    Response,
+    StreamingResponse,
 )
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from openai import OpenAI
+from starlette.types import ASGIApp, Receive, Scope, Send
+from openai import AsyncOpenAI
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 import uvicorn
 
 # ---------------------------------------------------------
@@ -28,15 +46,21 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
   raise RuntimeError("OPENAI_API_KEY is not set in environment or .env")
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Async client so OpenAI round-trips never block the event loop.
+aclient = AsyncOpenAI(api_key=OPENAI_API_KEY)
 
 MODEL_NAME = os.getenv("OPENAI_MODEL", "gpt-4o")
 TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "gpt-4o-mini-tts")
 VOICE_NAME = os.getenv("OPENAI_TTS_VOICE", "nova")
 TRANSCRIBE_MODEL = os.getenv("OPENAI_TRANSCRIBE_MODEL", "whisper-1")
+# Routes every /chat to the same prompt-cache bucket on OpenAI's side, so the
+# shared system prefix is reused instead of re-processed. Bump the suffix
+# whenever prompt.txt / MATH_OVERRIDES change meaningfully.
+PROMPT_CACHE_KEY = os.getenv("OPENAI_PROMPT_CACHE_KEY", "number-bot-v1")
 
 PROMPT_PATH = BASE_DIR / "prompt.txt"
 KNOWLEDGE_PATH = BASE_DIR / "knowledge.json"
+INDEX_PATH = BASE_DIR / "index.html"
 
 # ---------------------------------------------------------
 # LOAD PROMPT + KNOWLEDGE
@@ -49,6 +73,9 @@ else:
       "You respond ONLY with JSON containing keys: text, screen, visual_aid, _math_logic.\n"
   )
 
+# MATH_OVERRIDES (and the whole BASE_PROMPT) must stay static: never format
+# per-request values into it. OpenAI caches byte-identical prompt prefixes,
+# and any change here invalidates that cache for every turn.
 MATH_OVERRIDES = """
 IMPORTANT MATH DELEGATION RULES (OVERRIDE ANY EARLIER INSTRUCTIONS):
 
@@ -109,15 +136,50 @@ BASE_PROMPT = base_prompt_text + "\n" + MATH_OVERRIDES
 REFERENCE_DATA: Dict[str, Any] = {}
 if KNOWLEDGE_PATH.exists():
   try:
-    knowledge = json.loads(KNOWLEDGE_PATH.read_text(encoding="utf-8"))
+    knowledge = orjson.loads(KNOWLEDGE_PATH.read_bytes())
     REFERENCE_DATA = knowledge.get("reference_data", {})
   except Exception:
     REFERENCE_DATA = {}
 
+# REFERENCE_DATA never changes after import, so serialize it once here
+# instead of on every /chat call. Together with BASE_PROMPT this forms the
+# fixed prefix of every request, which is what lets OpenAI's automatic
+# prompt caching kick in. Don't mutate BASE_MESSAGES.
+REFERENCE_SYSTEM_MSG = (
+    orjson.dumps({"reference_data": REFERENCE_DATA}).decode()
+    if REFERENCE_DATA
+    else None
+)
+
+_base_messages = [{"role": "system", "content": BASE_PROMPT}]
+if REFERENCE_SYSTEM_MSG:
+  _base_messages.append({"role": "system", "content": REFERENCE_SYSTEM_MSG})
+BASE_MESSAGES: Tuple[Dict[str, str], ...] = tuple(_base_messages)
+
+# The UI shell is static, so read it once instead of on every GET /.
+INDEX_HTML = INDEX_PATH.read_bytes() if INDEX_PATH.exists() else None
+
 # ---------------------------------------------------------
 # FASTAPI APP + STATIC
 # ---------------------------------------------------------
-app = FastAPI()
+def dump_json(payload: Any) -> bytes:
+  """
+  orjson, except for numbers it can't encode: it rejects ints beyond 64 bits,
+  and kids do ask to count to a sextillion. Those rare payloads go through
+  stdlib json instead.
+  """
+  try:
+    return orjson.dumps(payload)
+  except orjson.JSONEncodeError:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class JSONBytesResponse(JSONResponse):
+  def render(self, content: Any) -> bytes:
+    return dump_json(content)
+
+
+app = FastAPI(default_response_class=JSONBytesResponse)
 
 # Static files (CSS, JS)
 app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
@@ -131,55 +193,157 @@ app.add_middleware(
   allow_credentials=True,
 )
 
+class GZipExceptAudioMiddleware:
+  """
+  GZipMiddleware for everything except the audio routes: MP3 doesn't
+  compress, and zlib would hold back streamed chunks. Routing by path keeps
+  this independent of which content types a Starlette release excludes.
+  """
+
+  def __init__(self, app: ASGIApp, minimum_size: int = 500) -> None:
+    self.app = app
+    self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+  async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] == "http" and scope["path"] in AUDIO_PATHS:
+      await self.app(scope, receive, send)
+    else:
+      await self.gzip(scope, receive, send)
+
+
+AUDIO_PATHS = frozenset({"/speak"})
+
+# The /chat payload is full of repeated digit groups and compresses well.
+# Starlette leaves text/event-stream (streamed /chat) alone on its own.
+app.add_middleware(GZipExceptAudioMiddleware, minimum_size=512)
+
 # ---------------------------------------------------------
 # SAFE EVAL FOR MATH
 # ---------------------------------------------------------
-ALLOWED_BINOPS = {
-  ast.Add: operator.add,
-  ast.Sub: operator.sub,
-  ast.Mult: operator.mul,
-  ast.Div: operator.truediv,
-  ast.FloorDiv: operator.floordiv,
-  ast.Mod: operator.mod,
-  ast.Pow: operator.pow,
+BINARY_OPS = {
+  "+": operator.add,
+  "-": operator.sub,
+  "*": operator.mul,
+  "/": operator.truediv,
+  "//": operator.floordiv,
+  "%": operator.mod,
+  "**": operator.pow,
 }
 
-ALLOWED_UNARY = {
-  ast.UAdd: operator.pos,
-  ast.USub: operator.neg,
+# Unary signs are rewritten to these tokens so RPN can tell them apart.
+UNARY_OPS = {
+  "u+": operator.pos,
+  "u-": operator.neg,
 }
 
+# (precedence, right_associative), matching Python: ** binds tighter than a
+# unary sign on its left (-2**2 == -4), which binds tighter than * / // %.
+PRECEDENCE = {
+  "+": (1, False),
+  "-": (1, False),
+  "*": (2, False),
+  "/": (2, False),
+  "//": (2, False),
+  "%": (2, False),
+  "u+": (3, True),
+  "u-": (3, True),
+  "**": (4, True),
+}
+
+TOKEN_RE = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|\*\*|//|[-+*/%()]")
+
+# Only short expressions are memoized, so a pathological input can't pin a
+# huge string in the cache.
+MAX_CACHED_EXPR_LEN = 200
+
+Program = Tuple[Union[int, float, str], ...]
+
 
 def safe_eval_expression(expr: str) -> float:
   """
   Safely evaluate a simple arithmetic expression consisting of numbers,
   +, -, *, /, //, %, **, parentheses, and unary +/-.
+  The expression is compiled once to RPN and cached, since kids repeat
+  themselves.
   """
-  node = ast.parse(expr, mode="eval")
-
-  def _eval(n: ast.AST) -> float:
-    if isinstance(n, ast.Expression):
-      return _eval(n.body)
-    if isinstance(n, ast.Constant):
-      if isinstance(n.value, (int, float)):
-        return n.value
-      raise ValueError("Non-numeric constant")
-    if isinstance(n, ast.BinOp):
-      op_type = type(n.op)
-      if op_type not in ALLOWED_BINOPS:
-        raise ValueError(f"Operator {op_type} not allowed")
-      left = _eval(n.left)
-      right = _eval(n.right)
-      return ALLOWED_BINOPS[op_type](left, right)
-    if isinstance(n, ast.UnaryOp):
-      op_type = type(n.op)
-      if op_type not in ALLOWED_UNARY:
-        raise ValueError(f"Unary operator {op_type} not allowed")
-      operand = _eval(n.operand)
-      return ALLOWED_UNARY[op_type](operand)
-    raise ValueError(f"Unsupported expression element: {type(n)}")
-
-  return _eval(node)
+  if len(expr) < MAX_CACHED_EXPR_LEN:
+    return _eval_rpn(_compile_cached(expr))
+  return _eval_rpn(_compile_expression(expr))
+
+
+def _compile_expression(expr: str) -> Program:
+  """
+  Shunting-yard: tokenize and convert to RPN, rejecting anything that isn't
+  a well-formed arithmetic expression.
+  """
+  tokens = TOKEN_RE.findall(expr)
+  if "".join(tokens) != "".join(expr.split()):
+    raise ValueError(f"Unsupported characters in expression: {expr!r}")
+
+  output: list = []
+  stack: list = []
+  expect_operand = True
+
+  for tok in tokens:
+    if tok[0].isdigit() or tok[0] == ".":
+      if not expect_operand:
+        raise ValueError("Missing operator between numbers")
+      output.append(int(tok) if tok.isdigit() else float(tok))
+      expect_operand = False
+    elif tok == "(":
+      if not expect_operand:
+        raise ValueError("Missing operator before '('")
+      stack.append(tok)
+    elif tok == ")":
+      if expect_operand:
+        raise ValueError("Missing operand before ')'")
+      while stack and stack[-1] != "(":
+        output.append(stack.pop())
+      if not stack:
+        raise ValueError("Unbalanced parentheses")
+      stack.pop()
+    elif expect_operand:
+      if tok not in ("+", "-"):
+        raise ValueError(f"Missing operand before {tok!r}")
+      # Prefix operator: nothing to its left can be popped yet.
+      stack.append("u" + tok)
+    else:
+      prec, right_assoc = PRECEDENCE[tok]
+      while stack and stack[-1] != "(":
+        top_prec = PRECEDENCE[stack[-1]][0]
+        if top_prec > prec or (top_prec == prec and not right_assoc):
+          output.append(stack.pop())
+        else:
+          break
+      stack.append(tok)
+      expect_operand = True
+
+  if expect_operand:
+    raise ValueError("Expression ends without an operand")
+  while stack:
+    tok = stack.pop()
+    if tok == "(":
+      raise ValueError("Unbalanced parentheses")
+    output.append(tok)
+
+  return tuple(output)
+
+
+def _eval_rpn(program: Program) -> float:
+  stack: list = []
+  for item in program:
+    if isinstance(item, str):
+      if item in UNARY_OPS:
+        stack[-1] = UNARY_OPS[item](stack[-1])
+      else:
+        right = stack.pop()
+        stack[-1] = BINARY_OPS[item](stack[-1], right)
+    else:
+      stack.append(item)
+  return stack[0]
+
+
+_compile_cached = lru_cache(maxsize=1024)(_compile_expression)
 
 
 # ---------------------------------------------------------
@@ -196,13 +360,49 @@ def build_count_sequence(n: int) -> Tuple[int, list, bool]:
   if n <= 10:
     return 1, list(range(1, n + 1)), False
 
-  step = max(n // 10, 1)
-  seq = [step * i for i in range(1, 10)]
-  if seq[-1] != n:
-    seq.append(n)
+  # n > 10 here, so step * 9 < n and the tenth jump is always n itself.
+  step = n // 10
+  seq = [step * i for i in range(1, 11)]
+  seq[-1] = n
   return step, seq, False
 
 
+# 1,000,000 int64s is 8 MB; COUNT targets like 10**21 must never get here.
+MAX_LARGE_SEQUENCE = 1_000_000
+
+
+def build_large_sequence(n: int, max_n: int = MAX_LARGE_SEQUENCE) -> array:
+  """
+  Full 1..n sequence as a packed int64 array, for when we want to show every
+  number rather than the 10 jumps. Built in C and ~3x smaller than a list;
+  call .tolist() at the JSON boundary.
+  Raises ValueError if n > max_n (default MAX_LARGE_SEQUENCE), so callers
+  must check the COUNT target first.
+  """
+  if n > max_n:
+    raise ValueError(f"Sequence of {n} numbers exceeds the limit of {max_n}")
+  if n <= 0:
+    return array("q")
+  return array("q", range(1, n + 1))
+
+
+_DAY = 86_400
+_YEAR = 365 * _DAY
+
+# (exclusive upper bound in seconds, divisor, unit name) for the
+# "count ~1 number per second" estimate, ordered by threshold.
+_TIME_TABLE: Tuple[Tuple[int, int, str], ...] = (
+  (121, 1, "seconds"),
+  (3_600, 60, "minutes"),
+  (48 * 3_600, 3_600, "hours"),
+  (2 * _YEAR, _DAY, "days"),
+  (1_000 * _YEAR, _YEAR, "years"),
+  (1_000_000 * _YEAR, 1_000 * _YEAR, "thousand years"),
+  (1_000_000_000 * _YEAR, 1_000_000 * _YEAR, "million years"),
+)
+_TIME_THRESHOLDS = tuple(row[0] for row in _TIME_TABLE)
+
+
 def estimate_count_time(num: int) -> Tuple[int, str]:
   """
   Rough estimate: count ~1 number per second.
@@ -210,40 +410,121 @@ def estimate_count_time(num: int) -> Tuple[int, str]:
   """
   seconds = int(num)
 
-  if seconds <= 120:
-    return seconds, f"about {seconds} seconds"
+  i = bisect_right(_TIME_THRESHOLDS, seconds)
+  if i == len(_TIME_TABLE):
+    return seconds, "longer than the age of the universe"
+
+  _, divisor, unit = _TIME_TABLE[i]
+  return seconds, f"about {round(seconds / divisor)} {unit}"
+
+
+# ---------------------------------------------------------
+# BRAIN OUTPUT MODELS
+# ---------------------------------------------------------
+INTENTS = ("COUNT", "CALCULATE", "SMALL_TALK")
+
+
+def _is_number(value: Any) -> bool:
+  return isinstance(value, (int, float)) and not isinstance(value, bool)
+
 
-  minutes = seconds / 60.0
-  if minutes < 60:
-    return seconds, f"about {round(minutes)} minutes"
+def _loose_str(value: Any) -> Optional[str]:
+  """Keep strings, stringify bare numbers, drop anything else."""
+  if isinstance(value, str):
+    return value
+  if _is_number(value):
+    return str(value)
+  return None
 
-  hours = minutes / 60.0
-  if hours < 48:
-    return seconds, f"about {round(hours)} hours"
 
-  days = hours / 24.0
-  if days < 365 * 2:
-    return seconds, f"about {round(days)} days"
+class MathLogic(BaseModel):
+  """
+  The _math_logic object the model fills in. Defaults cover any keys it
+  leaves out, and the "before" validators turn nulls or wrong-typed values
+  back into defaults, so one sloppy field never rejects the whole reply.
+  """
+  model_config = ConfigDict(extra="allow")
+
+  intent: Literal["COUNT", "CALCULATE", "SMALL_TALK"] = "SMALL_TALK"
+  target_number: Any = None
+  is_impossible: bool = False
+  step_size: Optional[Union[int, float]] = None
+  unit: Optional[str] = None
+  sequence: List[Any] = []
+  time_estimate_seconds: Optional[Union[int, float]] = None
+  time_estimate_text: Optional[str] = None
+  visual_aid: Any = None
+  expression: Optional[str] = None
+  spoken_problem: Optional[str] = None
+
+  @field_validator("intent", mode="before")
+  @classmethod
+  def _normalize_intent(cls, value: Any) -> str:
+    intent = value.upper() if isinstance(value, str) else ""
+    return intent if intent in INTENTS else "SMALL_TALK"
+
+  @field_validator("is_impossible", mode="before")
+  @classmethod
+  def _loose_bool(cls, value: Any) -> bool:
+    return value if isinstance(value, bool) else False
+
+  @field_validator("sequence", mode="before")
+  @classmethod
+  def _loose_list(cls, value: Any) -> list:
+    return value if isinstance(value, list) else []
+
+  @field_validator("step_size", "time_estimate_seconds", mode="before")
+  @classmethod
+  def _loose_number(cls, value: Any) -> Optional[Union[int, float]]:
+    return value if _is_number(value) else None
+
+  @field_validator(
+      "unit",
+      "time_estimate_text",
+      "expression",
+      "spoken_problem",
+      mode="before",
+  )
+  @classmethod
+  def _loose_optional_str(cls, value: Any) -> Optional[str]:
+    return _loose_str(value)
 
-  years = days / 365.0
-  if years < 1_000:
-    return seconds, f"about {round(years)} years"
-  if years < 1_000_000:
-    return seconds, f"about {round(years / 1_000)} thousand years"
-  if years < 1_000_000_000:
-    return seconds, f"about {round(years / 1_000_000)} million years"
 
-  return seconds, "longer than the age of the universe"
+class ChatOut(BaseModel):
+  """The /chat payload: the model's JSON reply plus backend fields."""
+  model_config = ConfigDict(extra="allow", populate_by_name=True)
+
+  text: str = ""
+  screen: str = ""
+  visual_aid: Any = None
+  math_logic: MathLogic = Field(default_factory=MathLogic, alias="_math_logic")
+  user_text: str = ""
+  parse_error: bool = Field(False, alias="_parse_error")
+
+  @field_validator("text", "screen", "user_text", mode="before")
+  @classmethod
+  def _loose_text(cls, value: Any) -> str:
+    return _loose_str(value) or ""
+
+  @field_validator("parse_error", mode="before")
+  @classmethod
+  def _loose_bool(cls, value: Any) -> bool:
+    return value if isinstance(value, bool) else False
+
+  @field_validator("math_logic", mode="before")
+  @classmethod
+  def _default_math_logic(cls, value: Any) -> Any:
+    return value if isinstance(value, (dict, MathLogic)) else {}
 
 
 # ---------------------------------------------------------
 # OPENAI HELPERS
 # ---------------------------------------------------------
-def transcribe_audio(audio_bytes: bytes) -> str:
+async def transcribe_audio(audio_bytes: bytes) -> str:
   audio_file = io.BytesIO(audio_bytes)
   audio_file.name = "audio.webm"
 
-  result = client.audio.transcriptions.create(
+  result = await aclient.audio.transcriptions.create(
       model=TRANSCRIBE_MODEL,
       file=audio_file,
       response_format="text",
@@ -251,165 +532,183 @@ def transcribe_audio(audio_bytes: bytes) -> str:
   return result.strip()
 
 
-def call_brain(user_text: str) -> Dict[str, Any]:
-  messages = [
-    {"role": "system", "content": BASE_PROMPT},
-  ]
-
-  if REFERENCE_DATA:
-    messages.append(
-        {
-          "role": "system",
-          "content": json.dumps(
-              {"reference_data": REFERENCE_DATA},
-              ensure_ascii=False,
-          ),
-        }
-    )
+def brain_messages(user_text: str) -> list:
+  # Per-user content always goes after the static prefix.
+  return [*BASE_MESSAGES, {"role": "user", "content": user_text}]
+
+
+# Unparseable model output is shown to the kid as-is; keep it short.
+MAX_RAW_TEXT_LEN = 200
+
+
+def parse_brain_output(raw: Optional[str]) -> ChatOut:
+  try:
+    return ChatOut.model_validate_json(raw)
+  except Exception:
+    text = raw or ""
+    if len(text) > MAX_RAW_TEXT_LEN:
+      text = text[:MAX_RAW_TEXT_LEN] + "..."
+    return ChatOut(text=text, parse_error=True)
 
-  messages.append({"role": "user", "content": user_text})
 
-  completion = client.chat.completions.create(
+async def call_brain(user_text: str) -> ChatOut:
+  completion = await aclient.chat.completions.create(
       model=MODEL_NAME,
-      messages=messages,
+      messages=brain_messages(user_text),
       response_format={"type": "json_object"},
       temperature=0.2,
+      prompt_cache_key=PROMPT_CACHE_KEY,
   )
 
   raw = completion.choices[0].message.content
+  return parse_brain_output(raw)
+
+
+def sse_event(event: str, payload: Any) -> str:
+  return f"event: {event}\ndata: {dump_json(payload).decode()}\n\n"
+
+
+async def stream_brain(user_text: str) -> AsyncIterator[str]:
+  """
+  Server-sent events version of call_brain + apply_math_logic:
+    - "delta": each raw JSON fragment as the model produces it,
+    - "done": the final payload with the backend-corrected math
+      (same shape as the non-streaming /chat response),
+    - "error": sent instead of "done" if anything fails after the stream
+      has started, in the same shape as the other /chat errors.
+  """
   try:
-    data = json.loads(raw)
+    stream = await aclient.chat.completions.create(
+        model=MODEL_NAME,
+        messages=brain_messages(user_text),
+        response_format={"type": "json_object"},
+        temperature=0.2,
+        prompt_cache_key=PROMPT_CACHE_KEY,
+        stream=True,
+    )
+
+    parts = []
+    async for chunk in stream:
+      if not chunk.choices:
+        continue
+      delta = chunk.choices[0].delta.content
+      if delta:
+        parts.append(delta)
+        yield sse_event("delta", delta)
+
+    data = parse_brain_output("".join(parts))
+    data = apply_math_logic(data, user_text)
+    data.user_text = user_text
   except Exception:
-    data = {
-      "text": raw,
-      "screen": "",
-      "visual_aid": None,
-      "_math_logic": {
-        "intent": "SMALL_TALK",
-        "target_number": None,
-        "is_impossible": False,
-        "step_size": None,
-        "unit": None,
-        "sequence": [],
-        "time_estimate_seconds": None,
-        "time_estimate_text": None,
-        "visual_aid": None,
-      },
-    }
-  return data
-
-
-def apply_math_logic(data: Dict[str, Any], transcript: str) -> Dict[str, Any]:
-  logic = data.get("_math_logic") or {}
-  intent = (logic.get("intent") or "").upper()
-
-  logic.setdefault("target_number", None)
-  logic.setdefault("is_impossible", False)
-  logic.setdefault("step_size", None)
-  logic.setdefault("unit", None)
-  logic.setdefault("sequence", [])
-  logic.setdefault("time_estimate_seconds", None)
-  logic.setdefault("time_estimate_text", None)
-  logic.setdefault("visual_aid", None)
+    # The 200 headers are already out, so report the failure in-band.
+    yield sse_event("error", {"error": "Brain request failed", "user_text": user_text})
+    return
+
+  yield sse_event("done", data.model_dump(by_alias=True))
+
+
+def apply_math_logic(data: ChatOut, transcript: str) -> ChatOut:
+  logic = data.math_logic
+  intent = logic.intent
+
+  # SMALL_TALK (the common case) needs no backend math: send it as-is.
+  if intent not in ("CALCULATE", "COUNT"):
+    return data
 
   if intent == "CALCULATE":
-    expr = (logic.get("expression") or "").strip()
-    spoken_problem = (logic.get("spoken_problem") or transcript).strip()
+    expr = (logic.expression or "").strip()
+    spoken_problem = (logic.spoken_problem or transcript).strip()
 
     if not expr:
-      logic["is_impossible"] = True
-      logic["sequence"] = []
-      data["screen"] = "I couldn't understand that math problem."
-      data["text"] = (
+      logic.is_impossible = True
+      logic.sequence = []
+      data.screen = "I couldn't understand that math problem."
+      data.text = (
           "I couldn't quite figure out that math problem, but we can try another one!"
       )
     else:
       try:
         result = safe_eval_expression(expr)
       except Exception:
-        logic["is_impossible"] = True
-        logic["sequence"] = []
-        data["screen"] = "I couldn't understand that math problem."
-        data["text"] = (
+        logic.is_impossible = True
+        logic.sequence = []
+        data.screen = "I couldn't understand that math problem."
+        data.text = (
             "I couldn't quite figure out that math problem, but we can try another one!"
         )
       else:
         if isinstance(result, float) and result.is_integer():
           result = int(result)
 
-        logic["target_number"] = result
-        logic["is_impossible"] = False
-        logic["sequence"] = [result]
+        logic.target_number = result
+        logic.is_impossible = False
+        logic.sequence = [result]
 
         if isinstance(result, int):
           screen = f"{result:,}"
         else:
           screen = f"{result:.4f}".rstrip("0").rstrip(".")
 
-        data["screen"] = screen
-        data["text"] = f"You asked what {spoken_problem} is. The answer is {screen}."
+        data.screen = screen
+        data.text = f"You asked what {spoken_problem} is. The answer is {screen}."
 
-    data["_math_logic"] = logic
     return data
 
   if intent == "COUNT":
-      target = logic.get("target_number")
+      target = logic.target_number
       try:
           n = int(target)
       except Exception:
           # If LLM couldn't supply a numeric target, treat as impossible
-          logic["is_impossible"] = True
-          logic["sequence"] = []
-          data["screen"] = ""
-          data["_math_logic"] = logic
+          logic.is_impossible = True
+          logic.sequence = []
+          data.screen = ""
           return data
 
       if n <= 0:
-          logic["is_impossible"] = True
-          logic["sequence"] = []
-          data["screen"] = ""
-          data["_math_logic"] = logic
+          logic.is_impossible = True
+          logic.sequence = []
+          data.screen = ""
           return data
 
       step_size, seq, is_impossible = build_count_sequence(n)
-      logic["step_size"] = step_size
-      logic["sequence"] = seq
-      logic["is_impossible"] = is_impossible
-      logic["target_number"] = n
+      logic.step_size = step_size
+      logic.sequence = seq
+      logic.is_impossible = is_impossible
+      logic.target_number = n
 
       # Time estimate for counting by ones
       seconds, time_text = estimate_count_time(n)
-      logic["time_estimate_seconds"] = seconds
-      logic["time_estimate_text"] = time_text
+      logic.time_estimate_seconds = seconds
+      logic.time_estimate_text = time_text
 
-      # Build screen string: for small n, just show 1..n; for big, the jumps
+      # Build screen string: for small n, just show 1..n; for big, the jumps.
+      # Format each number once; the spoken jumps reuse the same strings.
       if n <= 10:
-          screen = ", ".join(str(x) for x in seq)
           digits_for_voice = [str(x) for x in seq]
       else:
-          screen = ", ".join(f"{x:,}" for x in seq)
-          digits_for_voice = [f"{x:,}" for x in seq]
+          digits_for_voice = [format(x, ",") for x in seq]
+      screen = ", ".join(digits_for_voice)
 
-      data["screen"] = screen
+      data.screen = screen
 
       # Build spoken text that matches the same jumps.
-      unit = logic.get("unit")
+      unit = logic.unit
       target_digits = f"{n:,}"
 
       if unit:
           # crude pluralization: "popsicle" -> "popsicles" when number != 1
-          plural_unit = unit if n == 1 else unit + "s"
-          intro = f"Let's jump up to {target_digits} {plural_unit}."
+          unit_suffix = " " + (unit if n == 1 else unit + "s")
       else:
-          intro = f"Let's jump up to {target_digits}."
-
-      jumps_phrase = ", ".join(digits_for_voice)
-      # e.g. "Our ten jumps are: 100,000, 200,000, ...".
-      jumps_line = f" Our ten jumps are: {jumps_phrase}."
-      time_line = f" If you counted by ones, it would take {time_text}."
-
-      data["text"] = intro + jumps_line + time_line
-      data["_math_logic"] = logic
+          unit_suffix = ""
+
+      jumps_phrase = screen
+      # e.g. "Let's jump up to 1,000,000. Our ten jumps are: 100,000, ...".
+      data.text = (
+          f"Let's jump up to {target_digits}{unit_suffix}."
+          f" Our ten jumps are: {jumps_phrase}."
+          f" If you counted by ones, it would take {time_text}."
+      )
       return data
 
 
@@ -418,23 +717,25 @@ def apply_math_logic(data: Dict[str, Any], transcript: str) -> Dict[str, Any]:
 # ---------------------------------------------------------
 @app.get("/", response_class=HTMLResponse)
 async def index() -> HTMLResponse:
-  html_path = BASE_DIR / "index.html"
-  if not html_path.exists():
+  if INDEX_HTML is None:
     return HTMLResponse(
         "<h1>Number Bot UI not found (index.html missing)</h1>",
         status_code=500,
     )
-  return HTMLResponse(html_path.read_text(encoding="utf-8"))
+  return HTMLResponse(INDEX_HTML)
 
 
 @app.post("/chat")
-async def chat(request: Request, file: UploadFile = File(None)) -> JSONResponse:
+async def chat(request: Request, file: UploadFile = File(None)) -> Response:
   """
   Main brain endpoint:
     1) Transcribe audio,
     2) Ask LLM for JSON,
     3) Do real math in Python,
     4) Return JSON.
+  Text requests sent with "Accept: text/event-stream" get the model output
+  streamed back as SSE instead (see stream_brain), and clients sending
+  "Accept: application/x-msgpack" get the same payload as MessagePack.
   """
   content_type = request.headers.get("content-type", "")
 
@@ -442,17 +743,17 @@ async def chat(request: Request, file: UploadFile = File(None)) -> JSONResponse:
 
   if "multipart/form-data" in content_type:
     if file is None:
-      return JSONResponse(
+      return JSONBytesResponse(
           {"error": "No audio file provided", "user_text": ""},
           status_code=400,
       )
     audio_bytes = await file.read()
     if not audio_bytes:
-      return JSONResponse(
+      return JSONBytesResponse(
           {"error": "Empty audio file", "user_text": ""},
           status_code=400,
       )
-    user_text = transcribe_audio(audio_bytes)
+    user_text = await transcribe_audio(audio_bytes)
   else:
     try:
       body = await request.json()
@@ -461,16 +762,33 @@ async def chat(request: Request, file: UploadFile = File(None)) -> JSONResponse:
       user_text = ""
 
   if not user_text:
-    return JSONResponse(
+    return JSONBytesResponse(
         {"error": "No text captured from audio", "user_text": ""},
         status_code=400,
     )
 
-  data = call_brain(user_text)
+  is_text_request = "multipart/form-data" not in content_type
+  if is_text_request and "text/event-stream" in request.headers.get("accept", ""):
+    return StreamingResponse(
+        stream_brain(user_text),
+        media_type="text/event-stream",
+    )
+
+  data = await call_brain(user_text)
   data = apply_math_logic(data, user_text)
-  data["user_text"] = user_text
+  data.user_text = user_text
+  payload = data.model_dump(by_alias=True)
 
-  return JSONResponse(data)
+  if "application/x-msgpack" in request.headers.get("accept", ""):
+    try:
+      return Response(ormsgpack.packb(payload), media_type="application/x-msgpack")
+    except ormsgpack.MsgpackEncodeError:
+      # MessagePack has no ints beyond 64 bits; send those as JSON.
+      pass
+
+  # Return the response object itself: a bare dict would make FastAPI
+  # validate and re-encode the payload before orjson ever sees it.
+  return JSONBytesResponse(payload)
 
 
 @app.get("/speak")
@@ -483,13 +801,15 @@ async def speak(text: str) -> StreamingResponse:
         status_code=400,
     )
 
-  def audio_stream():
-    with client.audio.speech.with_streaming_response.create(
+  # Async generator so Starlette iterates it on the event loop instead of
+  # bouncing every chunk through the threadpool.
+  async def audio_stream():
+    async with aclient.audio.speech.with_streaming_response.create(
         model=TTS_MODEL,
         voice=VOICE_NAME,
         input=text,
     ) as resp:
-      for chunk in resp.iter_bytes():
+      async for chunk in resp.iter_bytes():
         yield chunk
 
   return StreamingResponse(audio_stream(), media_type="audio/mpeg")
@@ -502,4 +822,13 @@ async def health() -> Dict[str, str]:
 
 if __name__ == "__main__":
   port = int(os.getenv("PORT", "8000"))
-  uvicorn.run("app:app", host="0.0.0.0", port=port, reload=True)
+  # "auto" picks uvloop/httptools wherever uvicorn[standard] installed them
+  # (everywhere but Windows). Set RELOAD=1 for auto-reload while developing.
+  uvicorn.run(
+      "app:app",
+      host="0.0.0.0",
+      port=port,
+      loop="auto",
+      http="auto",
+      reload=os.getenv("RELOAD") == "1",
+  )
@@ -40,10 +40,13 @@ echo "Virtual environment activated: $(which python)"
 if [ ! -f "requirements.txt" ]; then
   cat > requirements.txt << 'EOF'
 fastapi
-uvicorn
+uvicorn[standard]
 openai
 python-dotenv
 python-multipart
+pydantic
+orjson
+ormsgpack
 EOF
   echo "Created default requirements.txt."
 fi
@@ -58,6 +61,7 @@ if [ ! -f ".env" ]; then
   cat > .env << 'EOF'
 OPENAI_API_KEY=sk-YOUR-KEY-HERE
 OPENAI_TTS_VOICE=nova
+RELOAD=1
 EOF
   echo "Created .env (edit it and add your real API key)."
 else